@@ -1,37 +1,49 @@
 #!/usr/bin/env python3
 
+import functools
 import json
 import sys
 from pathlib import Path
+from urllib.parse import quote_plus
 from datetime import datetime
 from typing import Dict, List, Any
 import subprocess
 
+try:
+    import orjson
+    def json_loads(data): return orjson.loads(data)
+except ImportError:
+    def json_loads(data): return json.loads(data)
+
 def load_list(filename: str) -> set:
     """Load a list of items from a file."""
-    if not Path(filename).exists():
+    path = Path(filename)
+    if not path.exists():
         return set()
-    with open(filename, 'r') as f:
-        return set(line.strip() for line in f if line.strip())
+    return {line.strip() for line in path.read_text().splitlines() if line.strip()}
 
+@functools.lru_cache(maxsize=1)
 def load_time_window() -> tuple[datetime, datetime]:
-    """Load start and end dates from time_window.json."""
+    """Load start and end dates from time_window.json (cached after first read)."""
     try:
-        with open('time_window.json', 'r') as f:
-            window = json.load(f)
-            start_date = datetime.strptime(window['start_date'], '%Y-%m-%d')
-            end_date = datetime.strptime(window['end_date'], '%Y-%m-%d')
-            return start_date, end_date
+        window = json_loads(Path('time_window.json').read_text())
+        start_date = datetime.fromisoformat(window['start_date'])
+        end_date = datetime.fromisoformat(window['end_date'])
+        return start_date, end_date
     except Exception as e:
         print(f"Error loading time window: {e}")
         # Fallback to default dates
         return datetime(2025, 3, 24), datetime(2025, 4, 24)
 
-def is_alert_date(date_str: str) -> bool:
+@functools.lru_cache(maxsize=None)
+def _parse_ymd(date_str: str) -> datetime:
+    """Parse a YYYY-MM-DD string, caching repeats (same dates recur per location)."""
+    return datetime.fromisoformat(date_str)
+
+def is_alert_date(date_str: str, start_date: datetime, end_date: datetime) -> bool:
     """Check if a date falls within the alert period."""
     try:
-        date = datetime.strptime(date_str, '%Y-%m-%d')
-        start_date, end_date = load_time_window()
+        date = _parse_ymd(date_str)
         return start_date <= date < end_date
     except ValueError:
         return False
@@ -39,97 +51,89 @@ def is_alert_date(date_str: str) -> bool:
 def load_url() -> str:
     """Load URL from rmv_url.txt file."""
     try:
-        with open('rmv_url.txt', 'r') as f:
-            return f.read().strip()
+        return Path('rmv_url.txt').read_text().strip()
     except Exception as e:
         print(f"Error loading URL: {e}")
         sys.exit(1)
 
-def analyze_appointments(data_file: str):
-    """Analyze appointments and alert on specific conditions."""
+def analyze_appointments(data: Dict[str, Any]):
+    """Analyze appointment data ({location: {date: [times]}}) and alert on matches."""
     url = load_url()
-    # Load blacklist
-    blacklist = load_list('blacklist.txt')
+    # Load the alert window once, not per date check
+    start_date, end_date = load_time_window()
+    # Load blacklist (frozen — it is only read from here on)
+    blacklist = frozenset(load_list('blacklist.txt'))
     # if blacklist:
     #     print(f"Loaded {len(blacklist)} blacklisted locations")
-    
-    # Load appointment data
-    try:
-        with open(data_file, 'r') as f:
-            data = json.load(f)
-    except Exception as e:
-        print(f"Error loading data file: {e}")
-        return
-    
-    # Track alerts
-    alerts = []
+
+    # Track alerts, grouped by location in a single pass over the data
+    alerts_by_location: Dict[str, List[Dict[str, Any]]] = {}
     match_found = False
-    
+
     # Analyze each location
     for location, dates in data.items():
         # Skip blacklisted locations
         if location in blacklist:
             continue
-            
+
         # Check each date
         # print(dates.items())
         for date, times in dates.items():
-            if is_alert_date(date):
-                alerts.append({
+            if is_alert_date(date, start_date, end_date):
+                alerts_by_location.setdefault(location, []).append({
                     'location': location,
                     'date': date,
-                    'times': sorted(times),
+                    # browse.py already dedupes and sorts times before saving
+                    'times': times,
                     'url': url
                 })
-                
+
                 if times:
                     match_found = True
-    
-    # Print alerts
-    if alerts:
-        print("\n=== ALERT: Available Appointments Found ===")
-        locations_printed = []
-        for alert in alerts:
-            if alert['location'] not in locations_printed:
-                locations_printed.append(alert['location'])
-                print(f"\n{alert['location']} on {datetime.strptime(alert['date'], '%Y-%m-%d').strftime('%A')}, {alert['date']} at {', '.join(alert['times'])}")
-                print(f"https://www.google.com/maps/search/{alert['location'].replace(' ', '+')}/@42.18,-72.51,9z/")
-                print(f"To blacklist this location:")
-                escaped = alert['location'].replace("'", "'\\''")
-                print(f"  echo '{escaped}' >> blacklist.txt")
-                print(f"To make the time window close before {alert['date']}:")
-                print(f"  jq --arg date '{alert['date']}' '.end_date = $date' time_window.json > tmp.json && mv tmp.json time_window.json")
+
+    # Print alerts (first alerting date per location) in a single write
+    if alerts_by_location:
+        lines = ["\n=== ALERT: Available Appointments Found ==="]
+        for location, location_alerts in alerts_by_location.items():
+            alert = location_alerts[0]
+            escaped = location.replace("'", "'\\''")
+            lines.extend([
+                f"\n{location} on {_parse_ymd(alert['date']).strftime('%A')}, {alert['date']} at {', '.join(alert['times'])}",
+                f"https://www.google.com/maps/search/{quote_plus(location)}/@42.18,-72.51,9z/",
+                "To blacklist this location:",
+                f"  echo '{escaped}' >> blacklist.txt",
+                f"To make the time window close before {alert['date']}:",
+                f"  jq --arg date '{alert['date']}' '.end_date = $date' time_window.json > tmp.json && mv tmp.json time_window.json",
+            ])
+        print("\n".join(lines))
     # else:
     #     print("\nNo alerts triggered for this data.")
-    
+
     if match_found:
         print("\nMatching appointments found! Launching Firefox...")
+        # One spawn with every URL — firefox opens each in its own tab —
+        # and no wait, so we don't serialize on N fork/exec round-trips
+        urls = [url] + [f"https://vas.im/firefox-alert/?alertText={location}"
+                        for location in alerts_by_location]
         try:
-            subprocess.run(['firefox', url], check=True, stderr=subprocess.DEVNULL)
+            subprocess.Popen(['firefox', *urls], stderr=subprocess.DEVNULL)
             # print("Firefox launched successfully")
-        except subprocess.CalledProcessError as e:
-            print(f"Error launching Firefox: {e}")
         except FileNotFoundError:
             print("Firefox not found in PATH")
-        unique_locations=[]
-        for alert in alerts:
-            if alert['location'] not in unique_locations:
-                unique_locations.append(alert['location'])
-                try:
-                    subprocess.run(['firefox', f"https://vas.im/firefox-alert/?alertText={alert['location']}"], check=True, stderr=subprocess.DEVNULL)
-                    # print("Firefox launched successfully")
-                except subprocess.CalledProcessError as e:
-                    print(f"Error launching Firefox: {e}")
-                except FileNotFoundError:
-                    print("Firefox not found in PATH")
 
 def main():
     if len(sys.argv) != 2:
         print("Usage: alert.py <data_file>")
         sys.exit(1)
-    
-    data_file = sys.argv[1]
-    analyze_appointments(data_file)
+
+    # Load appointment data
+    try:
+        data = json_loads(Path(sys.argv[1]).read_text())
+    except Exception as e:
+        print(f"Error loading data file: {e}")
+        return
+
+    analyze_appointments(data)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
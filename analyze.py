@@ -1,18 +1,27 @@
 #!/usr/bin/env python3
 
+import functools
 import json
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from pathlib import Path
 from datetime import datetime
 from IPython import embed
 from typing import Dict, Any, Tuple
 from collections import defaultdict
 
+try:
+    import orjson
+    def json_loads(data): return orjson.loads(data)
+except ImportError:
+    def json_loads(data): return json.loads(data)
+
 def load_list(filename: str) -> set:
     """Load a list of items from a file."""
-    if not Path(filename).exists():
+    path = Path(filename)
+    if not path.exists():
         return set()
-    with open(filename, 'r') as f:
-        return set(line.strip() for line in f if line.strip())
+    return {line.strip() for line in path.read_text().splitlines() if line.strip()}
 
 def load_data_files() -> Dict[str, Any]:
     """Load all JSON files from the data directory."""
@@ -32,20 +41,27 @@ def load_data_files() -> Dict[str, Any]:
         'timestamps': [],
         'data': {}
     }
-    
-    for json_file in json_files:
+
+    def load_one(json_file):
         timestamp = json_file.stem  # Get filename without extension
         try:
-            with open(json_file, 'r') as f:
-                data = json.load(f)
-                all_data['timestamps'].append(timestamp)
-                all_data['data'][timestamp] = data
+            return timestamp, json_loads(json_file.read_text())
         except Exception as e:
             print(f"Error loading {json_file}: {e}")
-    
+            return None
+
+    # Reads are independent, so load them in parallel threads
+    with ThreadPoolExecutor(max_workers=min(32, len(json_files))) as executor:
+        for result in executor.map(load_one, json_files):
+            if result is None:
+                continue
+            timestamp, data = result
+            all_data['timestamps'].append(timestamp)
+            all_data['data'][timestamp] = data
+
     # Sort timestamps chronologically
     all_data['timestamps'].sort()
-    
+
     return all_data
 
 def filter_blacklisted_locations(data: Dict[str, Any], blacklist: set) -> Dict[str, Any]:
@@ -56,14 +72,40 @@ def filter_blacklisted_locations(data: Dict[str, Any], blacklist: set) -> Dict[s
     }
     
     for timestamp, timestamp_data in data['data'].items():
+        # Common case: nothing blacklisted in this snapshot, keep it as-is
+        if blacklist.isdisjoint(timestamp_data.keys()):
+            filtered_data['data'][timestamp] = timestamp_data
+            continue
         filtered_data['data'][timestamp] = {
-            location: location_data 
-            for location, location_data in timestamp_data.items() 
+            location: location_data
+            for location, location_data in timestamp_data.items()
             if location not in blacklist
         }
-    
+
     return filtered_data
 
+@functools.lru_cache(maxsize=None)
+def _parse_hm(time_str: str) -> datetime:
+    """Parse an HH:MM time, caching repeats (the same slots recur across files)."""
+    return datetime.strptime(time_str, '%H:%M')
+
+def _appointment_candidates(data: Dict[str, Any]):
+    """Yield (datetime, date, time, location, timestamp) for each first slot."""
+    for timestamp, timestamp_data in data['data'].items():
+        for location, location_data in timestamp_data.items():
+            for date, times in location_data.items():
+                if not times:
+                    continue
+                try:
+                    appointment_dt = datetime.combine(
+                        datetime.fromisoformat(date).date(),
+                        _parse_hm(times[0]).time()
+                    )
+                except ValueError as e:
+                    print(f"Warning: Could not parse date/time: {date} {times[0]}: {e}")
+                    continue
+                yield appointment_dt, date, times[0], location, timestamp
+
 def analyze_data(data: Dict[str, Any]) -> Dict[str, Any]:
     """Analyze the data and extract key information."""
     analysis = {
@@ -83,41 +125,23 @@ def analyze_data(data: Dict[str, Any]) -> Dict[str, Any]:
     analysis['locations'] = sorted(analysis['locations'])
     analysis['dates'] = sorted(analysis['dates'])
     
-    # Find earliest appointment
-    earliest_time = None
-    earliest_info = None
-    
-    for timestamp, timestamp_data in data['data'].items():
-        for location, location_data in timestamp_data.items():
-            for date, times in location_data.items():
-                if not times:
-                    continue
-                    
-                # Convert date and first time to datetime
-                try:
-                    date_obj = datetime.strptime(date, '%Y-%m-%d')
-                    time_obj = datetime.strptime(times[0], '%H:%M')
-                    appointment_dt = datetime.combine(date_obj.date(), time_obj.time())
-                    
-                    if earliest_time is None or appointment_dt < earliest_time:
-                        earliest_time = appointment_dt
-                        earliest_info = {
-                            'datetime': appointment_dt,
-                            'date': date,
-                            'time': times[0],
-                            'location': location,
-                            'timestamp': timestamp
-                        }
-                except ValueError as e:
-                    print(f"Warning: Could not parse date/time: {date} {times[0]}: {e}")
-    
-    analysis['earliest_appointment'] = earliest_info
-    
+    # Find earliest appointment in one pass; min() does the comparisons in C
+    earliest = min(_appointment_candidates(data), key=itemgetter(0), default=None)
+    if earliest is not None:
+        appointment_dt, date, first_time, location, timestamp = earliest
+        analysis['earliest_appointment'] = {
+            'datetime': appointment_dt,
+            'date': date,
+            'time': first_time,
+            'location': location,
+            'timestamp': timestamp
+        }
+
     return analysis
 
 def main():
-    # Load blacklist
-    blacklist = load_list('blacklist.txt')
+    # Load blacklist (frozen — it is only read from here on)
+    blacklist = frozenset(load_list('blacklist.txt'))
     if blacklist:
         print(f"Loaded {len(blacklist)} blacklisted locations")
     
@@ -3,20 +3,29 @@
 from playwright.sync_api import sync_playwright
 from pprint import pprint as pp
 import argparse
+import functools
 import json
-import os
 from pathlib import Path
 from typing import Dict, List, Any
 from datetime import datetime
 import time
 import re
-import subprocess
 import sys
 
+import alert
+
+try:
+    import orjson
+    def json_loads(data): return orjson.loads(data)
+    def json_dumps(obj): return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    def json_loads(data): return json.loads(data)
+    def json_dumps(obj): return json.dumps(obj, indent=2)
+
 def load_list(filename):
-    if os.path.exists(filename):
-        with open(filename, 'r') as f:
-            return set(line.strip() for line in f if line.strip())
+    path = Path(filename)
+    if path.exists():
+        return {line.strip() for line in path.read_text().splitlines() if line.strip()}
     return set()
 
 def save_list(filename, items):
@@ -24,23 +33,82 @@ def save_list(filename, items):
         for item in sorted(items):
             f.write(f"{item}\n")
 
+# Matches the aria-label markup on date columns, e.g. "<p>Monday</p><p>Mar 24, 2025</p>"
+DATE_LABEL_RE = re.compile(r"<p>([A-Za-z]+)</p><p>([A-Za-z]+ \d+, \d{4})</p>")
+
+# Walks all date columns in-browser and returns a plain JSON structure, so we
+# pay one round-trip per page instead of one per element attribute.
+DATE_COLUMNS_JS = """() =>
+    Array.from(document.querySelectorAll('div.DateTimeGrouping-Column')).map(column => ({
+        aria_label: column.getAttribute('aria-label'),
+        groups: Array.from(column.querySelectorAll('div.DateTimeGrouping-Group')).map(group => {
+            const control = group.querySelector('div.DateTimeGrouping-Control');
+            const title = control && control.querySelector('.group-title');
+            const number = control && control.querySelector('.group-number');
+            return {
+                title: title ? title.textContent : '',
+                available_count: number ? number.textContent : '',
+                times: Array.from(group.querySelectorAll('div.ServiceAppointmentDateTime')).map(el => ({
+                    display: el.textContent,
+                    datetime: el.getAttribute('data-datetime')
+                }))
+            };
+        })
+    }))
+"""
+
+# Any one of these appearing means the page content we care about has rendered
+READY_SELECTOR = ", ".join([
+    "button.QflowObjectItem",
+    "div.DateTimeGrouping-Column",
+    "button.next-button",
+    "div.pagination-label-wrapper",
+])
+
+def wait_for_page(page, timeout=5000):
+    """Wait for the page to settle, returning as soon as known content appears."""
+    page.wait_for_load_state("networkidle")
+    try:
+        page.wait_for_selector(READY_SELECTOR, timeout=timeout)
+    except Exception:
+        # Some pages legitimately have none of the known elements; don't block longer
+        pass
+
+@functools.lru_cache(maxsize=None)
+def _parse_ymd(date_str: str) -> datetime:
+    """Parse a YYYY-MM-DD string, caching repeats (same dates recur per location)."""
+    return datetime.fromisoformat(date_str)
+
+@functools.lru_cache(maxsize=4096)
+def _parse_full_date(date_str: str) -> datetime:
+    """Parse a 'Mar 24, 2025' style date, caching repeats across locations/pages."""
+    return datetime.strptime(date_str, '%b %d, %Y')
+
+@functools.lru_cache(maxsize=4096)
+def _parse_slot_dt(dt_str: str) -> datetime:
+    """Parse a '03/24/2025 10:30:00 AM' slot datetime, caching repeats."""
+    return datetime.strptime(dt_str, '%m/%d/%Y %I:%M:%S %p')
+
+def _in_window(date: datetime) -> bool:
+    """Check if an already-parsed date falls within the alert period."""
+    start_date, end_date = load_time_window()
+    return start_date <= date < end_date
+
 def is_alert_date(date_str: str) -> bool:
     """Check if a date falls within the alert period."""
     try:
-        date = datetime.strptime(date_str, '%Y-%m-%d')
-        start_date, end_date = load_time_window()
-        return start_date <= date < end_date
+        return _in_window(_parse_ymd(date_str))
     except ValueError:
         return False
 
+@functools.lru_cache(maxsize=1)
 def load_time_window() -> tuple[datetime, datetime]:
-    """Load start and end dates from time_window.json."""
+    """Load start and end dates from time_window.json (cached after first read)."""
     try:
-        with open('time_window.json', 'r') as f:
-            window = json.load(f)
-            start_date = datetime.strptime(window['start_date'], '%Y-%m-%d')
-            end_date = datetime.strptime(window['end_date'], '%Y-%m-%d')
-            return start_date, end_date
+        window = json_loads(Path('time_window.json').read_text())
+        start_date = datetime.fromisoformat(window['start_date'])
+        end_date = datetime.fromisoformat(window['end_date'])
+        return start_date, end_date
     except Exception as e:
         print(f"Error loading time window: {e}")
         # Fallback to default dates
@@ -49,79 +117,55 @@ def load_time_window() -> tuple[datetime, datetime]:
 def parse_date_time_group(page, location: str) -> List[Dict[str, Any]]:
     """Parse date/time grouping elements from the page."""
     dates = []
-    
-    # Find all date columns
-    date_columns = page.locator("div.DateTimeGrouping-Column")
-    column_count = date_columns.count()
-    
-    # print(f"\nFound {column_count} date columns")
-    
-    for col_idx in range(column_count):
-        date_column = date_columns.nth(col_idx)
-        date_label = date_column.get_attribute("aria-label")
-        
+
+    # Pull all date columns in a single round-trip to the browser
+    columns = page.evaluate(DATE_COLUMNS_JS)
+
+    # print(f"\nFound {len(columns)} date columns")
+
+    for column in columns:
+        date_label = column['aria_label']
+
         # Parse date from aria-label
-        date_match = re.search(r"<p>([A-Za-z]+)</p><p>([A-Za-z]+ \d+, \d{4})</p>", date_label)
+        date_match = DATE_LABEL_RE.search(date_label or '')
         if not date_match:
             print(f"Could not parse date from: {date_label}")
             continue
-            
+
         day_name, full_date = date_match.groups()
         # print(f"\nProcessing date: {full_date} ({day_name})")
-        
+
         # Check if date is within alert window
 
         location_printed = False
         last_date = None
         outside_time_window = []
         try:
-            date_obj = datetime.strptime(full_date, '%b %d, %Y')
-            date_str = date_obj.strftime('%Y-%m-%d')
-            if is_alert_date(date_str):
+            date_obj = _parse_full_date(full_date)
+            if _in_window(date_obj):
                 date_data = {
                     'day_name': day_name,
                     'full_date': full_date,
                     'time_groups': []
                 }
-                
-                # Find time groups within this date column
-                time_groups = date_column.locator("div.DateTimeGrouping-Group")
-                group_count = time_groups.count()
-                # print(f"Found {group_count} time groups")
-                
-                for group_idx in range(group_count):
-                    time_group = time_groups.nth(group_idx)
-                    group_control = time_group.locator("div.DateTimeGrouping-Control")
-                    
-                    # Get group info (e.g., "Afternoon")
-                    group_title = group_control.locator(".group-title").text_content()
-                    available_count = group_control.locator(".group-number").text_content()
-                    
-                    # print(f"\nTime group: {group_title} ({available_count})")
-                    
+
+                for group in column['groups']:
+                    # print(f"\nTime group: {group['title']} ({group['available_count']})")
+
                     group_data = {
-                        'title': group_title,
-                        'available_count': available_count,
+                        'title': group['title'],
+                        'available_count': group['available_count'],
                         'times': []
                     }
-                    
-                    # Get available times
-                    times = time_group.locator("div.ServiceAppointmentDateTime")
-                    time_count = times.count()
-                    # print(f"Found {time_count} available times")
-                    
-                    for time_idx in range(time_count):
-                        time_element = times.nth(time_idx)
-                        time_text = time_element.text_content()
-                        time_data = time_element.get_attribute("data-datetime")
-                        
-                        # print(f"  Time: {time_text} ({time_data})")
-                        
+
+                    for time_data in group['times']:
+                        # print(f"  Time: {time_data['display']} ({time_data['datetime']})")
+
                         group_data['times'].append({
-                            'display': time_text,
-                            'datetime': time_data
+                            'display': time_data['display'],
+                            'datetime': time_data['datetime']
                         })
-                        
+
                         # Alert immediately when a time is found
                         if not location_printed:
                             print(f"{location}: ", end="")
@@ -129,8 +173,8 @@ def parse_date_time_group(page, location: str) -> List[Dict[str, Any]]:
                         if last_date != full_date:
                             print(f"{day_name}, {full_date} - ", end="")
                             last_date = full_date
-                        print(f" {time_text}", end="")
-                
+                        print(f" {time_data['display']}", end="")
+
                 date_data['time_groups'].append(group_data)
                 dates.append(date_data)
                 print()
@@ -140,46 +184,26 @@ def parse_date_time_group(page, location: str) -> List[Dict[str, Any]]:
                 print(f"There were appointments outside the time window: {outside_time_window[0]} - {outside_time_window[-1]}")
         except ValueError:
             continue
-    
-    return dates
 
-def get_button_data(button) -> Dict[str, Any]:
-    """Extract relevant data from a button element."""
-    return {
-        'text': button.text_content().strip(),
-        'id': button.get_attribute('id'),
-        'class': button.get_attribute('class'),
-        'type': button.get_attribute('type'),
-        'disabled': button.get_attribute('disabled')
-    }
+    return dates
 
 def get_page_data(page, location: str, max_retries=3) -> Dict[str, Any]:
     """Collect all relevant data from the current page with retries."""
+    # 'buttons' kept (empty) for output format compatibility; nothing downstream
+    # reads it and harvesting every <button> was the biggest per-page cost
     data = {
         'buttons': [],
         'timestamp': datetime.now().isoformat(),
         'url': page.url,
         'dates': []
     }
-    
+
     # Wait for the page to be stable
-    page.wait_for_load_state("networkidle")
-    page.wait_for_load_state("domcontentloaded")
-    
-    # Add a small delay to ensure the page is fully rendered
-    time.sleep(1)
-    
-    # Try to get button data with retries
+    wait_for_page(page)
+
+    # Try to get date data with retries
     for attempt in range(max_retries):
         try:
-            # Get all buttons
-            buttons = page.locator("button")
-            count = buttons.count()
-            
-            for i in range(count):
-                button = buttons.nth(i)
-                data['buttons'].append(get_button_data(button))
-            
             # Parse date/time information
             data['dates'] = parse_date_time_group(page, location)
             
@@ -194,49 +218,41 @@ def get_page_data(page, location: str, max_retries=3) -> Dict[str, Any]:
                 print(f"Warning: Could not get page data after {max_retries} attempts: {e}")
                 return data
 
-def transform_data(all_data: Dict[str, Any]) -> Dict[str, Dict[str, List[str]]]:
-    """Transform the raw data into a simplified format with dates and times."""
-    transformed = {}
-    
-    for location, location_data in all_data['locations'].items():
-        transformed[location] = {}
-        
-        # Process each page for this location
-        for page in location_data['pages']:
-            for date_data in page['dates']:
-                # Convert date string to ISO format (YYYY-MM-DD)
+def merge_page_dates(location_dates: Dict[str, set], page_dates: List[Dict[str, Any]]) -> None:
+    """Fold one page's parsed dates into a location's {iso_date: {times}} dict.
+
+    Times are collected as sets since the same slot can show up on several
+    pages. Merging page by page means the raw page data can be discarded as
+    we go instead of being held in memory for the whole scrape.
+    """
+    for date_data in page_dates:
+        # Convert date string to ISO format (YYYY-MM-DD)
+        try:
+            date_obj = _parse_full_date(date_data['full_date'])
+            iso_date = date_obj.strftime('%Y-%m-%d')
+        except ValueError as e:
+            print(f"Warning: Could not parse date {date_data['full_date']}: {e}")
+            continue
+
+        times = location_dates.setdefault(iso_date, set())
+
+        # Process each time group
+        for time_group in date_data['time_groups']:
+            for time_data in time_group['times']:
                 try:
-                    date_obj = datetime.strptime(date_data['full_date'], '%b %d, %Y')
-                    iso_date = date_obj.strftime('%Y-%m-%d')
+                    # Convert time string to HH:MM format
+                    time_obj = _parse_slot_dt(time_data['datetime'])
+                    times.add(time_obj.strftime('%H:%M'))
                 except ValueError as e:
-                    print(f"Warning: Could not parse date {date_data['full_date']}: {e}")
+                    print(f"Warning: Could not parse time {time_data['datetime']}: {e}")
                     continue
-                
-                # Initialize the date entry if it doesn't exist
-                if iso_date not in transformed[location]:
-                    transformed[location][iso_date] = []
-                
-                # Process each time group
-                for time_group in date_data['time_groups']:
-                    for time_data in time_group['times']:
-                        try:
-                            # Convert time string to HH:MM format
-                            time_obj = datetime.strptime(time_data['datetime'], '%m/%d/%Y %I:%M:%S %p')
-                            time_str = time_obj.strftime('%H:%M')
-                            transformed[location][iso_date].append(time_str)
-                        except ValueError as e:
-                            print(f"Warning: Could not parse time {time_data['datetime']}: {e}")
-                            continue
-    
-    return transformed
 
 def load_url() -> str:
     """Load URL from rmv_url.txt file."""
     try:
-        with open('rmv_url.txt', 'r') as f:
-            url = f.read().strip()
-            print(f"Loaded URL: {url}")
-            return url
+        url = Path('rmv_url.txt').read_text().strip()
+        print(f"Loaded URL: {url}")
+        return url
     except Exception as e:
         print(f"Error loading URL: {e}")
         sys.exit(1)
@@ -254,12 +270,9 @@ def test_list_buttons():
     
     url = load_url()
     
-    # Store all collected data
-    all_data = {
-        'start_time': datetime.now().isoformat(),
-        'locations': {}
-    }
-    
+    # Transformed appointment data, built up incrementally per page
+    transformed_data: Dict[str, Dict[str, List[str]]] = {}
+
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
         page = browser.new_page()
@@ -269,8 +282,7 @@ def test_list_buttons():
         
         # Go to initial page and wait for it to be ready
         page.goto(url)
-        page.wait_for_load_state("networkidle")
-        page.wait_for_load_state("domcontentloaded")
+        wait_for_page(page)
         
         # Get all town buttons
         town_buttons = page.locator("button.QflowObjectItem.form-control.ui-selectable")
@@ -295,25 +307,18 @@ def test_list_buttons():
                     continue
                 print(f"Processing location {i+1}/{town_count}: {location}")
                 
-                # Store data for this location
-                location_data = {
-                    'location': location,
-                    'pages': []
-                }
-                
+                # Dates/times for this location, committed only on success
+                location_dates: Dict[str, set] = {}
+
                 # Click the town button and wait for navigation
                 # print(f"Clicking town button {i+1}/{town_count}: {location}")
                 town_button.click()
                 # print("Town button clicked")
-                page.wait_for_load_state("networkidle")
-                page.wait_for_load_state("domcontentloaded")
+                wait_for_page(page)
                 # print("Page loaded")
                 
-                # Add a small delay to ensure the page is fully rendered
-                time.sleep(1)
-                
-                # Collect data from this page
-                location_data['pages'].append(get_page_data(page, location))
+                # Collect data from this page and discard the raw form
+                merge_page_dates(location_dates, get_page_data(page, location)['dates'])
                 # print("Page data collected")
                 
                 # Handle both types of Next buttons
@@ -337,29 +342,25 @@ def test_list_buttons():
                     else:
                         break
                     
-                    page.wait_for_load_state("networkidle")
-                    page.wait_for_load_state("domcontentloaded")
-                    time.sleep(1)  # Wait for page to stabilize
-                    location_data['pages'].append(get_page_data(page, location))
-                
-                # Store the collected data
-                all_data['locations'][location] = location_data
+                    wait_for_page(page)
+                    merge_page_dates(location_dates, get_page_data(page, location)['dates'])
+
+                # Store the collected data, deduped and sorted once per date
+                transformed_data[location] = {
+                    date: sorted(times) for date, times in location_dates.items()
+                }
                 
                 # Go back to the town selection page
                 # print("Returning to main page")
                 page.goto(url)
-                page.wait_for_load_state("networkidle")
-                page.wait_for_load_state("domcontentloaded")
-                time.sleep(1)  # Wait for page to stabilize
+                wait_for_page(page)
                 
             except Exception as e:
                 print(f"Error processing location {i+1}: {e}")
                 # Try to recover by going back to the main page
                 try:
                     page.goto(url)
-                    page.wait_for_load_state("networkidle")
-                    page.wait_for_load_state("domcontentloaded")
-                    time.sleep(1)
+                    wait_for_page(page)
                 except:
                     print("Could not recover to main page")
                     break
@@ -381,7 +382,7 @@ def test_list_buttons():
         return
     
     # Update whitelist with new locations
-    current_locations = set(all_data['locations'].keys())
+    current_locations = set(transformed_data.keys())
     new_locations = current_locations - blacklist - whitelist
     if new_locations:
         whitelist.update(new_locations)
@@ -390,11 +391,8 @@ def test_list_buttons():
         for loc in sorted(new_locations):
             print(f"  {loc}")
     
-    # Transform the data into the desired format
-    # print("\nTransforming data into simplified format...")
-    transformed_data = transform_data(all_data)
     # pp(transformed_data)
-    
+
     # Create data directory if it doesn't exist
     data_dir = Path('data')
     data_dir.mkdir(exist_ok=True)
@@ -405,7 +403,7 @@ def test_list_buttons():
     
     # Save the transformed data
     with open(output_file, 'w') as f:
-        json.dump(transformed_data, f, indent=2)
+        f.write(json_dumps(transformed_data))
     
     # print(f"\nTransformed data saved to {output_file}")
     
@@ -416,32 +414,10 @@ def test_list_buttons():
     #     for date, times in dates.items():
     #         print(f"  {date}: {', '.join(sorted(times))}")
     
-    # Launch alert.py in a subprocess
-    # print("\nLaunching alert analysis...")
-    alert_script = Path(__file__).parent / 'alert.py'
-    
-    # Print the command that will be executed
-    cmd = [str(alert_script), str(output_file)]
-    print(f"Executing: {' '.join(cmd)}")
-    
+    # Run the alert analysis in-process on the data we already have in memory
+    print("\nRunning alert analysis...")
     try:
-        # Run the subprocess and wait for completion
-        result = subprocess.run(
-            [sys.executable] + cmd,
-            capture_output=True,
-            text=True
-        )
-        
-        # Print the output
-        if result.stdout:
-            print("\nAlert output:")
-            print(result.stdout)
-        if result.stderr:
-            print("\nAlert errors:")
-            print(result.stderr)
-            
-        if result.returncode != 0:
-            print(f"\nAlert process exited with code {result.returncode}")
+        alert.analyze_appointments(transformed_data)
     except Exception as e:
         print(f"Error running alert analysis: {e}")
 